@@ -1,9 +1,13 @@
+import logging
 from pathlib import Path
 from video_download_pipeline import VideoDownloader
 
 # Resolve paths relative to this script's directory
 script_dir = Path(__file__).resolve().parent
 
+# Show per-video progress
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
 # Initialize downloader
 downloader = VideoDownloader(output_dir=str(script_dir / 'data'))
 
@@ -5,12 +5,90 @@ import csv
 from pathlib import Path
 from datetime import datetime
 import hashlib
+import functools
 import time
 import sys
+import re
+import asyncio
+import atexit
+import logging
+import traceback
+import threading
+import subprocess
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+try:
+    from diskcache import Cache
+except ImportError:
+    Cache = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Concurrent download workers and per-host politeness limit
+TASKS_COUNT = 8
+PER_HOST_LIMIT = 2
+
+# Snapshot collection_log.json every N new videos or T seconds
+COMMIT_EVERY = 16
+COMMIT_INTERVAL = 60
+
+# Info fields read by _extract_metadata; only these are cached per URL
+_CACHED_INFO_FIELDS = (
+    'webpage_url', 'url', 'title', 'duration', 'upload_date', 'uploader',
+    'uploader_id', 'channel', 'view_count', 'like_count', 'description',
+    'tags', 'categories', 'width', 'height', 'fps', 'vcodec', 'acodec',
+    'filesize',
+)
+
+# VTT cue markup like <c> </c> <v> </v> and header lines to drop
+_VTT_TAG_RE = re.compile(r'<[^>]+>')
+_VTT_SKIP_PREFIX = ('WEBVTT', 'Kind:', 'Language:')
+
+def _write_json(path, obj):
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, indent=2, ensure_ascii=False)
+
+
+def _append_jsonl(path, obj):
+    if orjson is not None:
+        with open(path, 'ab') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS) + b'\n')
+    else:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(obj, ensure_ascii=False) + '\n')
+
+
+def _remux_to_mp4(src, dst):
+    # Remux to a temporary name so a failed run never leaves a broken mp4
+    part = dst + '.part'
+    try:
+        subprocess.run(
+            ['ffmpeg', '-y', '-loglevel', 'error', '-i', src, '-c', 'copy', '-f', 'mp4', part],
+            check=True,
+        )
+    except BaseException:
+        if os.path.exists(part):
+            os.remove(part)
+        raise
+    os.replace(part, dst)
+    os.remove(src)
+
 
 class VideoDownloader:
-    def __init__(self, output_dir='data'):
+    def __init__(self, output_dir='data', verbose=False):
         self.output_dir = Path(output_dir)
+        self.verbose = verbose
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         # Separate directories
@@ -22,7 +100,12 @@ class VideoDownloader:
             d.mkdir(parents=True, exist_ok=True)
         
         self.metadata_file = self.output_dir / 'collection_log.json'
+        self.jsonl_path = self.output_dir / 'collection_log.jsonl'
         self.failed_file = self.output_dir / 'failed_downloads.txt'
+        self._failed_fp = None
+        
+        # Extracted info cache keyed by URL (optional, needs diskcache)
+        self.cache = Cache(self.output_dir / '.meta_cache') if Cache is not None else None
         
         # Load existing metadata
         if self.metadata_file.exists():
@@ -36,30 +119,50 @@ class VideoDownloader:
                 'total_videos': 0,
                 'videos': []
             }
-    
-    def save_metadata(self):
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self.collection_data, f, indent=2, ensure_ascii=False)
-    
-    def download_video(self, url, subject, source, video_index):
-        print(f"\n{'='*80}")
-        print(f"Downloading video {video_index}: {url}")
-        print(f"Subject: {subject} | Source: {source}")
-        print(f"{'='*80}")
         
-        # Generate video ID from URL
-        video_id = self._generate_video_id(url)
+        # Index of downloaded video IDs for O(1) duplicate checks
+        self._known_ids = {v['video_id'] for v in self.collection_data['videos']}
         
-        # Check if already downloaded
-        if self._is_already_downloaded(video_id):
-            print(f"⚠️  Video {video_id} already downloaded. Skipping...")
-            return True
-
-        ydl_opts = {
+        # Replay videos appended to the log since the last snapshot
+        if self.jsonl_path.exists():
+            truncate_at = None
+            with open(self.jsonl_path, 'rb') as f:
+                offset = 0
+                for line in f:
+                    start, offset = offset, offset + len(line)
+                    if not line.strip():
+                        continue
+                    try:
+                        video = json.loads(line)
+                    except ValueError:
+                        if line.endswith(b'\n'):
+                            logger.warning("⚠️  Skipping corrupt line in %s", self.jsonl_path)
+                            continue
+                        # Append cut short by a crash: drop it so later appends start clean
+                        logger.warning("⚠️  Truncating incomplete last line of %s", self.jsonl_path)
+                        truncate_at = start
+                        break
+                    if video['video_id'] in self._known_ids:
+                        continue
+                    self.collection_data['videos'].append(video)
+                    self._known_ids.add(video['video_id'])
+                    self.collection_data['total_videos'] += 1
+            if truncate_at is not None:
+                os.truncate(self.jsonl_path, truncate_at)
+        
+        # ffmpeg remuxing runs off the download threads; the pool is created
+        # on first use since ffmpeg does the work in its own process
+        self._ffmpeg_pool = None
+        self._pending_ffmpeg = []
+        
+        # Videos appended since the last snapshot
+        self._dirty_since = 0
+        self._last_commit = time.monotonic()
+        
+        # yt-dlp options shared by every download; outtmpl is set per video
+        self._base_opts = {
             # Format selection
             'format': 'bestvideo[height<=720][ext=mp4]+bestaudio[ext=m4a]/best[height<=720][ext=mp4]/best',
-            # Output template
-            'outtmpl': str(self.video_dir / f'{video_index:03d}_{video_id}.%(ext)s'),
             'writesubtitles': True,
             'writeautomaticsub': False,
             'subtitleslangs': ['en'],
@@ -78,82 +181,280 @@ class VideoDownloader:
             'http_headers': {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             },
-            # Postprocessors
-            'postprocessors': [{
-                'key': 'FFmpegVideoConvertor',
-                'preferedformat': 'mp4',
-            }],
+            # Abort in-flight downloads when the batch is interrupted
+            'progress_hooks': [self._check_stop],
         }
         
+        # One YoutubeDL per download thread, reused across videos
+        self._ydl_local = threading.local()
+        self._ydl_instances = []
+        
+        # Guards collection_data, which is mutated from download worker threads;
+        # reentrant since save_metadata runs both with and without it held
+        self._lock = threading.RLock()
+        
+        # video_id -> file prefix of mp4s left by earlier runs, scanned once
+        self._previous_downloads = None
+        
+        # IDs currently being downloaded, and the batch interrupt flag
+        self._in_flight = set()
+        self._stop = threading.Event()
+        atexit.register(self.close)
+    
+    def save_metadata(self):
+        # Write the snapshot atomically, then drop the log it now covers;
+        # held under the lock so no append lands between the two
+        with self._lock:
+            tmp_file = self.metadata_file.with_name(self.metadata_file.name + '.tmp')
+            _write_json(tmp_file, self.collection_data)
+            os.replace(tmp_file, self.metadata_file)
+            open(self.jsonl_path, 'w').close()
+            self._dirty_since = 0
+            self._last_commit = time.monotonic()
+    
+    def _append_log(self, metadata):
+        _append_jsonl(self.jsonl_path, metadata)
+    
+    def download_video(self, url, subject, source, video_index):
+        logger.debug("%s", '=' * 80)
+        logger.info("Downloading video %d: %s", video_index, url)
+        logger.info("Subject: %s | Source: %s", subject, source)
+        logger.debug("%s", '=' * 80)
+        
+        # Generate video ID from URL
+        video_id = self._generate_video_id(url)
+        
+        if self._stop.is_set():
+            return False
+        
+        # Check if already downloaded, and reserve the ID so a duplicate row
+        # in the same batch is not downloaded concurrently
+        with self._lock:
+            if self._is_already_downloaded(video_id) or video_id in self._in_flight:
+                logger.info("⚠️  Video %s already downloaded. Skipping...", video_id)
+                return True
+            self._in_flight.add(video_id)
+        
         try:
-            # Download video and extract info
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                print("⏳ Extracting video information...")
-                info = ydl.extract_info(url, download=True)
-                
-                # Extract and save metadata
-                metadata = self._extract_metadata(info, subject, source, video_index)
-                
-                # Save metadata JSON
-                metadata_file = self.metadata_dir / f'{video_index:03d}_{video_id}_metadata.json'
-                with open(metadata_file, 'w', encoding='utf-8') as f:
-                    json.dump(metadata, f, indent=2, ensure_ascii=False)
+            # Reuse previously extracted info if the video is already on disk
+            info = self._load_cached_info(url, video_index, video_id)
+            if info is not None:
+                logger.info("⚡ Using cached video information...")
+            else:
+                # Download video and extract info
+                ydl = self._get_ydl()
+                ydl.params['outtmpl'] = {
+                    'default': str(self.video_dir / f'{video_index:03d}_{video_id}.%(ext)s'),
+                }
+                logger.info("⏳ Extracting video information...")
+                info = ydl.sanitize_info(ydl.extract_info(url, download=True))
+                if self.cache is not None:
+                    self.cache.set(url, self._slim_info(info), expire=86400)
                 
-                # Extract transcript from downloaded files
-                has_transcript = self._extract_transcript_from_files(video_index, video_id)
-                
-                # If no manual subtitles, we'll use Whisper later
-                if not has_transcript:
-                    print("   ⚠️  No manual subtitles - will need Whisper transcription later")
-                    metadata['needs_whisper_transcription'] = True
-                else:
-                    metadata['needs_whisper_transcription'] = False
-                
-                # Update metadata with transcript status
-                with open(metadata_file, 'w', encoding='utf-8') as f:
-                    json.dump(metadata, f, indent=2, ensure_ascii=False)
-                
-                # Add to collection
+                # Remux non-mp4 downloads off the download thread
+                self._submit_remux(info, url, subject, video_index, video_id)
+            
+            # Extract transcript from downloaded files
+            has_transcript = self._extract_transcript_from_files(video_index, video_id)
+            
+            # If no manual subtitles, we'll use Whisper later
+            if not has_transcript:
+                logger.info("   ⚠️  No manual subtitles - will need Whisper transcription later")
+            
+            # Extract metadata, complete with transcript status
+            metadata = self._extract_metadata(info, subject, source, video_index, video_id, has_transcript)
+            
+            # Save metadata JSON
+            metadata_file = self.metadata_dir / f'{video_index:03d}_{video_id}_metadata.json'
+            _write_json(metadata_file, metadata)
+            
+            # Add to collection
+            with self._lock:
                 self.collection_data['videos'].append(metadata)
+                self._known_ids.add(metadata['video_id'])
                 self.collection_data['total_videos'] += 1
-                self.save_metadata()
-                
-                print(f"✅ Successfully downloaded: {metadata['title']}")
-                print(f"   Duration: {metadata['duration']//60}:{metadata['duration']%60:02d}")
-                print(f"   Resolution: {metadata['resolution']}")
-                print(f"   Has Manual Subtitles: {has_transcript}")
-                
-                return True
-                
+                self._append_log(metadata)
+                self._dirty_since += 1
+                if (self._dirty_since >= COMMIT_EVERY or
+                    time.monotonic() - self._last_commit >= COMMIT_INTERVAL):
+                    self.save_metadata()
+            
+            logger.info("✅ Successfully downloaded: %s", metadata['title'])
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("   Duration: %d:%02d", metadata['duration'] // 60, metadata['duration'] % 60)
+                logger.info("   Resolution: %s", metadata['resolution'])
+                logger.info("   Has Manual Subtitles: %s", has_transcript)
+            
+            return True
+            
         except KeyboardInterrupt:
-            print(f"\n⚠️  Download interrupted by user")
+            logger.warning("⚠️  Download interrupted by user")
             raise
             
         except Exception as e:
-            print(f"❌ Failed to download {url}")
-            print(f"   Error: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            if self._stop.is_set():
+                logger.warning("⚠️  Download of %s interrupted by user", url)
+                return False
             
-            # Log failure
-            with open(self.failed_file, 'a', encoding='utf-8') as f:
-                f.write(f"{datetime.now().isoformat()}|{url}|{subject}|{str(e)}\n")
+            logger.error("❌ Failed to download %s: %s", url, e)
+            if self.verbose:
+                traceback.print_exc()
             
+            self._log_failure(url, subject, e)
             return False
+        
+        finally:
+            with self._lock:
+                self._in_flight.discard(video_id)
+    
+    def _check_stop(self, progress):
+        if self._stop.is_set():
+            raise yt_dlp.utils.DownloadCancelled('Download interrupted by user')
     
-    def _generate_video_id(self, url):
-        return hashlib.md5(url.encode()).hexdigest()[:12]
+    def _get_ydl(self):
+        ydl = getattr(self._ydl_local, 'ydl', None)
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL(dict(self._base_opts))
+            self._ydl_local.ydl = ydl
+            with self._lock:
+                self._ydl_instances.append(ydl)
+        return ydl
+    
+    def close(self):
+        with self._lock:
+            for ydl in self._ydl_instances:
+                ydl.close()
+            self._ydl_instances.clear()
+            if self._failed_fp is not None:
+                self._failed_fp.close()
+                self._failed_fp = None
+            if self._ffmpeg_pool is not None:
+                self._ffmpeg_pool.shutdown()
+                self._ffmpeg_pool = None
+        self._ydl_local = threading.local()
+    
+    def _log_failure(self, url, subject, error):
+        with self._lock:
+            if self._failed_fp is None:
+                self._failed_fp = open(self.failed_file, 'a', encoding='utf-8', buffering=8192)
+            self._failed_fp.write(f"{datetime.now().isoformat()}|{url}|{subject}|{str(error)}\n")
+    
+    def _submit_remux(self, info, url, subject, video_index, video_id):
+        dst = self.video_dir / f'{video_index:03d}_{video_id}.mp4'
+        for download in info.get('requested_downloads') or []:
+            src = download.get('filepath')
+            if src and Path(src) != dst:
+                with self._lock:
+                    if self._ffmpeg_pool is None:
+                        self._ffmpeg_pool = ThreadPoolExecutor(
+                            max_workers=max(1, (os.cpu_count() or 2) // 2)
+                        )
+                    future = self._ffmpeg_pool.submit(_remux_to_mp4, src, str(dst))
+                    self._pending_ffmpeg.append((future, url, subject, video_index, video_id))
+    
+    def wait_for_postprocessing(self):
+        with self._lock:
+            pending, self._pending_ffmpeg = self._pending_ffmpeg, []
+        
+        discarded = 0
+        for future, url, subject, video_index, video_id in pending:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error("❌ Failed to remux %s: %s", url, e)
+                # The video has no usable mp4, so treat it as a failed download
+                if self._discard_video(video_index, video_id):
+                    self._log_failure(url, subject, e)
+                    discarded += 1
+        
+        if discarded:
+            self.save_metadata()
+        return discarded
+    
+    def _discard_video(self, video_index, video_id):
+        with self._lock:
+            if video_id not in self._known_ids:
+                return False
+            videos = self.collection_data['videos']
+            videos[:] = [v for v in videos if v['video_id'] != video_id]
+            self._known_ids.discard(video_id)
+            self.collection_data['total_videos'] -= 1
+        (self.metadata_dir / f'{video_index:03d}_{video_id}_metadata.json').unlink(missing_ok=True)
+        (self.video_dir / f'{video_index:03d}_{video_id}.mp4').unlink(missing_ok=True)
+        return True
+    
+    def _slim_info(self, info):
+        slim = {key: info[key] for key in _CACHED_INFO_FIELDS if key in info}
+        # Only the subtitle languages are needed, not the track URLs
+        slim['subtitles'] = {lang: [] for lang in info.get('subtitles') or {}}
+        return slim
+    
+    def _scan_previous_downloads(self):
+        previous = {}
+        with os.scandir(self.video_dir) as it:
+            for entry in it:
+                name = entry.name
+                if name.endswith('.mp4'):
+                    prefix = name[:-len('.mp4')]
+                    previous[prefix.partition('_')[2]] = prefix
+        return previous
+    
+    def _adopt_previous_download(self, video_index, video_id):
+        # Indices shift between runs, so look for the video under any index
+        with self._lock:
+            if self._previous_downloads is None:
+                self._previous_downloads = self._scan_previous_downloads()
+            old_prefix = self._previous_downloads.pop(video_id, None)
+        
+        prefix = f'{video_index:03d}_{video_id}'
+        if old_prefix is None:
+            return False
+        if old_prefix == prefix:
+            return True
+        
+        # Renumber the earlier run's files to this run's index
+        with os.scandir(self.video_dir) as it:
+            names = [e.name for e in it if e.name.startswith(old_prefix)]
+        for name in names:
+            os.replace(self.video_dir / name, self.video_dir / (prefix + name[len(old_prefix):]))
+        
+        # Transcripts were already moved out of the video directory
+        for ext in ('vtt', 'txt'):
+            old_transcript = self.transcript_dir / f'{old_prefix}_transcript.{ext}'
+            if old_transcript.exists():
+                old_transcript.replace(self.transcript_dir / f'{prefix}_transcript.{ext}')
+        return True
+    
+    def _load_cached_info(self, url, video_index, video_id):
+        if not self._adopt_previous_download(video_index, video_id):
+            return None
+        
+        if self.cache is not None:
+            info = self.cache.get(url)
+            if info is not None:
+                return info
+        
+        # Fall back to the info.json written by yt-dlp on a previous run
+        info_file = self.video_dir / f'{video_index:03d}_{video_id}.info.json'
+        if info_file.exists():
+            with open(info_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        
+        return None
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _generate_video_id(url):
+        # IDs must stay stable across runs, so keep MD5 rather than a new hash
+        return hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()[:12]
     
     def _is_already_downloaded(self, video_id):
-        for video in self.collection_data['videos']:
-            if video['video_id'] == video_id:
-                return True
-        return False
+        return video_id in self._known_ids
     
-    def _extract_metadata(self, info, subject, source, video_index):
+    def _extract_metadata(self, info, subject, source, video_index, video_id, has_transcript):
         metadata = {
             'video_index': video_index,
-            'video_id': self._generate_video_id(info.get('webpage_url', info.get('id', ''))),
+            'video_id': video_id,
             'url': info.get('webpage_url', info.get('url', '')),
             'title': info.get('title', 'Unknown'),
             'duration': info.get('duration', 0),
@@ -172,7 +473,8 @@ class VideoDownloader:
             'acodec': info.get('acodec', ''),
             'filesize': info.get('filesize', 0),
             'has_manual_subtitles': 'en' in info.get('subtitles', {}),
-            'filename': f"{video_index:03d}_{self._generate_video_id(info.get('webpage_url', ''))}.mp4",
+            'filename': f"{video_index:03d}_{video_id}.mp4",
+            'needs_whisper_transcription': not has_transcript,
 
             'subject': subject,
             'source': source,
@@ -181,167 +483,182 @@ class VideoDownloader:
         
         return metadata
     
+    def _find_vtt_file(self, video_index, video_id):
+        prefix = f'{video_index:03d}_{video_id}'
+        with os.scandir(self.video_dir) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith(prefix) and name.endswith('.vtt'):
+                    return Path(entry.path)
+        return None
+    
     def _extract_transcript_from_files(self, video_index, video_id):
-        # Look for downloaded subtitle files
-        vtt_files = list(self.video_dir.glob(f'{video_index:03d}_{video_id}*.vtt'))
+        # Use the first VTT file found (manual subtitles)
+        vtt_file = self._find_vtt_file(video_index, video_id)
         
-        if not vtt_files:
-            return False
+        # Destination paths
+        vtt_dest = self.transcript_dir / f'{video_index:03d}_{video_id}_transcript.vtt'
+        txt_dest = self.transcript_dir / f'{video_index:03d}_{video_id}_transcript.txt'
+        
+        if vtt_file is None:
+            # Already moved and parsed on a previous run
+            return txt_dest.exists()
         
         try:
-            # Use the first VTT file found (manual subtitles)
-            vtt_file = vtt_files[0]
+            # Move VTT into the transcript directory
+            vtt_file.replace(vtt_dest)
             
-            # Destination paths
-            vtt_dest = self.transcript_dir / f'{video_index:03d}_{video_id}_transcript.vtt'
-            txt_dest = self.transcript_dir / f'{video_index:03d}_{video_id}_transcript.txt'
+            # Parse to plain text, streaming line by line
+            length = 0
+            with open(vtt_dest, 'r', encoding='utf-8') as src, \
+                 open(txt_dest, 'w', encoding='utf-8') as dst:
+                for line in self._parse_vtt_stream(src):
+                    if length:
+                        dst.write(' ')
+                        length += 1
+                    dst.write(line)
+                    length += len(line)
             
-            # Read VTT content
-            with open(vtt_file, 'r', encoding='utf-8') as f:
-                vtt_content = f.read()
-            
-            # Save VTT copy
-            with open(vtt_dest, 'w', encoding='utf-8') as f:
-                f.write(vtt_content)
-            
-            # Parse to plain text
-            transcript_text = self._parse_vtt_content(vtt_content)
-            
-            # Save plain text
-            with open(txt_dest, 'w', encoding='utf-8') as f:
-                f.write(transcript_text)
-            
-            print(f"   ✅ Transcript extracted: {len(transcript_text)} characters")
+            logger.info("   ✅ Transcript extracted: %d characters", length)
             return True
             
         except Exception as e:
-            print(f"   ⚠️  Failed to extract transcript: {str(e)}")
+            logger.warning("   ⚠️  Failed to extract transcript: %s", e)
             return False
     
-    def _parse_vtt_content(self, vtt_content):
-        lines = vtt_content.split('\n')
-        transcript = []
-        
-        for line in lines:
+    def _parse_vtt_stream(self, fileobj):
+        for line in fileobj:
             line = line.strip()
             
             # Skip headers, timestamps, and empty lines
-            if (line.startswith('WEBVTT') or 
-                '-->' in line or 
-                line.isdigit() or 
-                not line or
-                line.startswith('Kind:') or
-                line.startswith('Language:')):
+            if (not line or
+                line.startswith(_VTT_SKIP_PREFIX) or
+                '-->' in line or
+                line.isdigit()):
                 continue
             
             # Remove VTT tags like <c> </c> <v> </v>
-            import re
-            line = re.sub(r'<[^>]+>', '', line)
+            line = _VTT_TAG_RE.sub('', line)
             
             # Skip if empty after tag removal
             if not line.strip():
                 continue
             
-            transcript.append(line)
-        
-        return ' '.join(transcript)
+            yield line
     
     def download_batch(self, video_list_file):
         if not Path(video_list_file).exists():
             print(f"❌ Video list file not found: {video_list_file}")
             return
         
-        with open(video_list_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            videos = list(reader)
-        
         print(f"\n{'='*80}")
-        print(f"BATCH DOWNLOAD: {len(videos)} videos")
+        print(f"BATCH DOWNLOAD: {video_list_file}")
         print(f"Python version: {sys.version}")
         print(f"yt-dlp version: {yt_dlp.version.__version__}")
         print(f"Videos without manual subtitles will need Whisper transcription")
         print(f"{'='*80}\n")
         
-        success_count = 0
-        no_subtitle_count = 0
+        self._stop.clear()
+        self._previous_downloads = self._scan_previous_downloads()
         start_index = self.collection_data['total_videos'] + 1
+        start_len = len(self.collection_data['videos'])
+        results = {}
+        remux_failed = 0
         
-        for i, row in enumerate(videos, start=start_index):
-            try:
-                success = self.download_video(
-                    url=row['url'],
-                    subject=row['subject'],
-                    source=row['source'],
-                    video_index=i
-                )
-                
-                if success:
-                    success_count += 1
-                    # Check if needs Whisper
-                    if self.collection_data['videos'][-1].get('needs_whisper_transcription', False):
-                        no_subtitle_count += 1
-                
-                # Rate limiting (be nice to servers)
-                if i < len(videos) + start_index - 1:
-                    print(f"\n⏳ Waiting 5 seconds before next download...")
-                    time.sleep(5)
-                    
-            except KeyboardInterrupt:
-                print(f"\n\n{'='*80}")
-                print(f"DOWNLOAD INTERRUPTED BY USER")
-                print(f"Progress: {success_count}/{i-start_index+1} videos")
-                print(f"{'='*80}\n")
-                break
+        try:
+            # Rows are streamed from the CSV as workers become free
+            with open(video_list_file, 'r', encoding='utf-8') as f:
+                reader = csv.DictReader(f)
+                asyncio.run(self._download_batch_async(reader, start_index, results))
+        except KeyboardInterrupt:
+            print(f"\n\n{'='*80}")
+            print(f"DOWNLOAD INTERRUPTED BY USER")
+            print(f"Progress: {sum(results.values())}/{len(results)} videos")
+            print(f"{'='*80}\n")
+        finally:
+            remux_failed = self.wait_for_postprocessing()
+            self.close()
+            self.save_metadata()
+            self._previous_downloads = None
+        
+        success_count = sum(results.values()) - remux_failed
+        no_subtitle_count = sum(
+            1 for v in self.collection_data['videos'][start_len:]
+            if v.get('needs_whisper_transcription', False)
+        )
         
         print(f"\n{'='*80}")
         print(f"DOWNLOAD COMPLETE")
-        print(f"✅ Success: {success_count}/{len(videos)}")
-        print(f"❌ Failed: {len(videos) - success_count}")
+        print(f"✅ Success: {success_count}/{len(results)}")
+        print(f"❌ Failed: {len(results) - success_count}")
         print(f"⚠️  Need Whisper transcription: {no_subtitle_count}")
         print(f"{'='*80}\n")
         
         if no_subtitle_count > 0:
             print(f"📝 Need Whisper transcription on {no_subtitle_count} videos")
     
+    async def _download_batch_async(self, videos, start_index, results):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=TASKS_COUNT * 2)
+        
+        # Per-host rate limiting (be nice to servers)
+        host_limits = defaultdict(lambda: asyncio.Semaphore(PER_HOST_LIMIT))
+        thread_pool = ThreadPoolExecutor(max_workers=TASKS_COUNT)
+        
+        async def producer():
+            for i, row in enumerate(videos, start=start_index):
+                await queue.put((i, row))
+            for _ in range(TASKS_COUNT):
+                await queue.put(None)
+        
+        async def worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                i, row = item
+                results[i] = False
+                async with host_limits[urlparse(row['url']).netloc]:
+                    results[i] = await loop.run_in_executor(
+                        thread_pool,
+                        self.download_video,
+                        row['url'],
+                        row['subject'],
+                        row['source'],
+                        i,
+                    )
+        
+        try:
+            await asyncio.gather(producer(), *(worker() for _ in range(TASKS_COUNT)))
+        except asyncio.CancelledError:
+            # Interrupted: drop queued downloads and cancel running ones at
+            # their next progress tick, then wait for the workers to unwind
+            # before the caller closes YoutubeDL and writes the snapshot
+            self._stop.set()
+            thread_pool.shutdown(wait=True, cancel_futures=True)
+            raise
+        else:
+            thread_pool.shutdown(wait=True)
+    
     def generate_statistics(self):
+        self.wait_for_postprocessing()
+        
         if not self.collection_data['videos']:
             print("No videos downloaded yet.")
             return
         
+        videos = self.collection_data['videos']
         stats = {
-            'total_videos': len(self.collection_data['videos']),
-            'by_subject': {},
-            'by_difficulty': {},
-            'by_source': {},
-            'total_duration_hours': 0,
+            'total_videos': len(videos),
+            'by_subject': dict(Counter(v['subject'] for v in videos)),
+            'by_difficulty': dict(Counter(v.get('difficulty', 'Unknown') for v in videos)),
+            'by_source': dict(Counter(v['source'] for v in videos)),
+            'total_duration_hours': sum(v['duration'] for v in videos) / 3600,
             'avg_duration_minutes': 0,
-            'with_manual_subtitles': 0,
-            'needs_whisper': 0,
+            'with_manual_subtitles': sum(1 for v in videos if v.get('has_manual_subtitles', False)),
+            'needs_whisper': sum(1 for v in videos if v.get('needs_whisper_transcription', False)),
         }
         
-        for video in self.collection_data['videos']:
-            # Subject distribution
-            subject = video['subject']
-            stats['by_subject'][subject] = stats['by_subject'].get(subject, 0) + 1
-            
-            # Difficulty distribution
-            difficulty = video['difficulty']
-            stats['by_difficulty'][difficulty] = stats['by_difficulty'].get(difficulty, 0) + 1
-            
-            # Source distribution
-            source = video['source']
-            stats['by_source'][source] = stats['by_source'].get(source, 0) + 1
-            
-            # Duration
-            stats['total_duration_hours'] += video['duration'] / 3600
-            
-            # Subtitles
-            if video.get('has_manual_subtitles', False):
-                stats['with_manual_subtitles'] += 1
-            
-            if video.get('needs_whisper_transcription', False):
-                stats['needs_whisper'] += 1
-        
         stats['avg_duration_minutes'] = (stats['total_duration_hours'] * 60) / stats['total_videos']
         
         print(f"\n{'='*80}")
@@ -367,14 +684,17 @@ class VideoDownloader:
         
         print(f"\n{'='*80}\n")
         
+        # Snapshot the collection alongside the statistics
+        self.save_metadata()
+        
         # Save statistics
         stats_file = self.output_dir / 'statistics.json'
-        with open(stats_file, 'w', encoding='utf-8') as f:
-            json.dump(stats, f, indent=2, ensure_ascii=False)
+        _write_json(stats_file, stats)
         
         return stats
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     downloader = VideoDownloader(output_dir='data')
     print("Use: downloader.download_batch('video_urls.csv')")